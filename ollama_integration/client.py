@@ -34,6 +34,9 @@ class OllamaClient:
         self.timeout = timeout
         self.connect_timeout = connect_timeout
         
+        # One session per client so requests reuse pooled keep-alive connections
+        self.session = requests.Session()
+        
         logger.info(f"Initialized Ollama client: {self.host}")
     
     def health_check(self) -> bool:
@@ -44,7 +47,7 @@ class OllamaClient:
             True if server is healthy, False otherwise
         """
         try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
+            response = self.session.get(f"{self.host}/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.warning(f"Ollama health check failed: {e}")
@@ -105,7 +108,7 @@ class OllamaClient:
             if stream:
                 return self._stream_generate(url, payload)
             else:
-                response = requests.post(
+                response = self.session.post(
                     url, 
                     json=payload, 
                     timeout=(self.connect_timeout, self.timeout)
@@ -135,7 +138,7 @@ class OllamaClient:
             Response chunks
         """
         try:
-            with requests.post(
+            with self.session.post(
                 url, 
                 json=payload, 
                 stream=True, 
@@ -213,7 +216,7 @@ class OllamaClient:
             if stream:
                 return self._stream_generate(url, payload)
             else:
-                response = requests.post(
+                response = self.session.post(
                     url, 
                     json=payload, 
                     timeout=(self.connect_timeout, self.timeout)
@@ -241,7 +244,7 @@ class OllamaClient:
         url = f"{self.base_url}/tags"
         
         try:
-            response = requests.get(url, timeout=self.connect_timeout)
+            response = self.session.get(url, timeout=self.connect_timeout)
             response.raise_for_status()
             return response.json()
         
@@ -289,7 +292,7 @@ class OllamaClient:
         payload = {"name": model}
         
         try:
-            response = requests.post(url, json=payload, timeout=300)
+            response = self.session.post(url, json=payload, timeout=300)
             response.raise_for_status()
             return response.json()
         
@@ -8,12 +8,21 @@ Responsibilities:
 - Ensure subtasks are executable
 """
 
+import sys
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
+# Dataclass slots need Python 3.10+; older versions keep a __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+def _task_id(number: int) -> str:
+    """Build an interned task ID so set and dict lookups can match by identity."""
+    return sys.intern(f'task_{number}')
+
+
+@dataclass(**_SLOTS)
 class SubTask:
     """Represents a subtask in the decomposition tree."""
     id: str
@@ -124,7 +133,7 @@ class TaskDecomposer:
         
         for phase_desc, domain in phases:
             subtask = SubTask(
-                id=f'task_{task_id}',
+                id=_task_id(task_id),
                 description=f'{phase_desc} for {analysis["description"]}',
                 parent_id=parent_id,
                 domain=domain,
@@ -133,7 +142,7 @@ class TaskDecomposer:
             
             # Add dependencies (sequential)
             if task_id > 1:
-                subtask.dependencies.append(f'task_{task_id - 1}')
+                subtask.dependencies.append(_task_id(task_id - 1))
             
             subtasks.append(subtask)
             task_id += 1
@@ -155,7 +164,7 @@ class TaskDecomposer:
         
         for phase_desc, domain in phases:
             subtask = SubTask(
-                id=f'task_{task_id}',
+                id=_task_id(task_id),
                 description=f'{phase_desc} for {analysis["description"]}',
                 parent_id=parent_id,
                 domain=domain,
@@ -163,7 +172,7 @@ class TaskDecomposer:
             )
             
             if task_id > 1:
-                subtask.dependencies.append(f'task_{task_id - 1}')
+                subtask.dependencies.append(_task_id(task_id - 1))
             
             subtasks.append(subtask)
             task_id += 1
@@ -185,7 +194,7 @@ class TaskDecomposer:
         
         for phase_desc, domain in phases:
             subtask = SubTask(
-                id=f'task_{task_id}',
+                id=_task_id(task_id),
                 description=f'{phase_desc} for {analysis["description"]}',
                 parent_id=parent_id,
                 domain=domain,
@@ -193,7 +202,7 @@ class TaskDecomposer:
             )
             
             if task_id > 1:
-                subtask.dependencies.append(f'task_{task_id - 1}')
+                subtask.dependencies.append(_task_id(task_id - 1))
             
             subtasks.append(subtask)
             task_id += 1
@@ -215,7 +224,7 @@ class TaskDecomposer:
         
         for phase_desc, domain in phases:
             subtask = SubTask(
-                id=f'task_{task_id}',
+                id=_task_id(task_id),
                 description=f'{phase_desc} for {analysis["description"]}',
                 parent_id=parent_id,
                 domain=domain,
@@ -223,7 +232,7 @@ class TaskDecomposer:
             )
             
             if task_id > 1:
-                subtask.dependencies.append(f'task_{task_id - 1}')
+                subtask.dependencies.append(_task_id(task_id - 1))
             
             subtasks.append(subtask)
             task_id += 1
@@ -246,7 +255,7 @@ class TaskDecomposer:
         
         for idx, req in enumerate(requirements[:5], 1):  # Limit to 5 subtasks
             subtask = SubTask(
-                id=f'task_{idx}',
+                id=_task_id(idx),
                 description=req,
                 parent_id=parent_id,
                 domain='general',
@@ -255,7 +264,7 @@ class TaskDecomposer:
             
             # Add sequential dependency
             if idx > 1:
-                subtask.dependencies.append(f'task_{idx - 1}')
+                subtask.dependencies.append(_task_id(idx - 1))
             
             subtasks.append(subtask)
         
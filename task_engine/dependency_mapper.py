@@ -9,7 +9,7 @@ Responsibilities:
 """
 
 from typing import Dict, List, Set, Any, Optional
-from collections import defaultdict, deque
+from collections import defaultdict
 
 
 class DependencyMapper:
@@ -21,11 +21,38 @@ class DependencyMapper:
         """Initialize the dependency mapper."""
         self.graph = defaultdict(list)  # adjacency list
         self.in_degree = defaultdict(int)  # in-degree for topological sort
+        self._ready_masks = None  # (subtasks, ID -> bit, dependency mask per subtask)
+    
+    def _index_dependencies(self, subtasks: List[Dict[str, Any]]):
+        """
+        Map task and dependency IDs to bits and build each subtask's dependency mask.
+        
+        The result is cached together with the `subtasks` list it came from.
+        """
+        bits = {}
+        deps_masks = []
+        for task in subtasks:
+            bits.setdefault(task['id'], 1 << len(bits))
+        for task in subtasks:
+            deps_mask = 0
+            for dep in task.get('dependencies', []):
+                bit = bits.get(dep)
+                if bit is None:
+                    bit = bits[dep] = 1 << len(bits)
+                deps_mask |= bit
+            deps_masks.append(deps_mask)
+        
+        self._ready_masks = (subtasks, bits, deps_masks)
+        return self._ready_masks
     
     def build_graph(self, subtasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Build dependency graph from subtasks.
         
+        Runs Kahn's algorithm once over integer task indices. Each BFS
+        layer of the sort is a parallel group, and the sort leaving tasks
+        unprocessed means there is a cycle.
+        
         Args:
             subtasks: List of subtask dictionaries with dependencies
             
@@ -39,23 +66,60 @@ class DependencyMapper:
         """
         self.graph = defaultdict(list)
         self.in_degree = defaultdict(int)
+        self._index_dependencies(subtasks)
+        
+        # Remap task IDs to integer indices
+        task_index = {}
+        for task in subtasks:
+            task_index.setdefault(task['id'], len(task_index))
+        task_ids = list(task_index)
+        n = len(task_ids)
+        
+        adjacency = [[] for _ in range(n)]
+        in_degree = [0] * n
+        # Tasks depending on an unknown ID can never become ready
+        blocked = [False] * n
         
         # Build the graph
         for task in subtasks:
             task_id = task['id']
-            # Initialize in_degree for all tasks
-            if task_id not in self.in_degree:
-                self.in_degree[task_id] = 0
+            idx = task_index[task_id]
+            self.graph.setdefault(task_id, [])
+            self.in_degree.setdefault(task_id, 0)
             
             # Add edges for dependencies
             for dep in task.get('dependencies', []):
                 self.graph[dep].append(task_id)
                 self.in_degree[task_id] += 1
+                
+                dep_idx = task_index.get(dep)
+                if dep_idx is None:
+                    blocked[idx] = True
+                else:
+                    adjacency[dep_idx].append(idx)
+                    in_degree[idx] += 1
+        
+        # Kahn's algorithm, one layer at a time
+        layers = []
+        layer = [idx for idx in range(n) if in_degree[idx] == 0]
+        processed = 0
+        
+        while layer:
+            layers.append(layer)
+            processed += len(layer)
+            next_layer = []
+            
+            for idx in layer:
+                for neighbor in adjacency[idx]:
+                    if blocked[idx]:
+                        blocked[neighbor] = True
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        next_layer.append(neighbor)
+            
+            layer = next_layer
         
-        # Check for cycles
-        has_cycles = self._has_cycles(list(self.graph.keys()))
-        
-        if has_cycles:
+        if processed != n:
             return {
                 'graph': dict(self.graph),
                 'in_degree': dict(self.in_degree),
@@ -65,9 +129,14 @@ class DependencyMapper:
                 'error': 'Circular dependency detected'
             }
         
-        # Calculate execution order and parallel groups
-        execution_order = self._topological_sort()
-        parallel_groups = self._identify_parallel_groups(subtasks)
+        # Map indices back to task IDs, leaving out blocked tasks
+        parallel_groups = []
+        for layer in layers:
+            group = [task_ids[idx] for idx in layer if not blocked[idx]]
+            if group:
+                parallel_groups.append(group)
+        
+        execution_order = [task_id for group in parallel_groups for task_id in group]
         
         return {
             'graph': dict(self.graph),
@@ -77,132 +146,15 @@ class DependencyMapper:
             'has_cycles': False
         }
     
-    def _topological_sort(self) -> List[str]:
-        """
-        Perform topological sort using Kahn's algorithm.
-        
-        Returns:
-            List of task IDs in execution order
-        """
-        # Create a copy of in_degree
-        in_degree_copy = self.in_degree.copy()
-        
-        # Find all nodes with in-degree 0
-        queue = deque([node for node in in_degree_copy if in_degree_copy[node] == 0])
-        result = []
-        
-        while queue:
-            node = queue.popleft()
-            result.append(node)
-            
-            # Reduce in-degree for neighbors
-            for neighbor in self.graph[node]:
-                in_degree_copy[neighbor] -= 1
-                if in_degree_copy[neighbor] == 0:
-                    queue.append(neighbor)
-        
-        return result
-    
-    def _has_cycles(self, nodes: List[str]) -> bool:
-        """
-        Check if the graph has cycles using DFS.
-        
-        Args:
-            nodes: List of node IDs to check
-            
-        Returns:
-            True if cycles exist, False otherwise
-        """
-        visited = set()
-        rec_stack = set()
-        
-        def dfs(node: str) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
-            
-            for neighbor in self.graph[node]:
-                if neighbor not in visited:
-                    if dfs(neighbor):
-                        return True
-                elif neighbor in rec_stack:
-                    return True
-            
-            rec_stack.remove(node)
-            return False
-        
-        for node in nodes:
-            if node not in visited:
-                if dfs(node):
-                    return True
-        
-        return False
-    
-    def _identify_parallel_groups(self, subtasks: List[Dict[str, Any]]) -> List[List[str]]:
-        """
-        Identify groups of tasks that can run in parallel.
-        
-        Tasks can run in parallel if:
-        1. They have no dependencies on each other
-        2. They have the same depth in the dependency tree
-        
-        Args:
-            subtasks: List of subtask dictionaries
-            
-        Returns:
-            List of parallel groups, where each group is a list of task IDs
-        """
-        # Calculate depth for each task
-        depths = self._calculate_depths(subtasks)
-        
-        # Group tasks by depth
-        depth_groups = defaultdict(list)
-        for task_id, depth in depths.items():
-            depth_groups[depth].append(task_id)
-        
-        # Convert to list of groups
-        parallel_groups = []
-        for depth in sorted(depth_groups.keys()):
-            group = depth_groups[depth]
-            if len(group) > 1:
-                # Multiple tasks at same depth can run in parallel
-                parallel_groups.append(group)
-            else:
-                # Single task, add as its own group
-                parallel_groups.append(group)
-        
-        return parallel_groups
-    
-    def _calculate_depths(self, subtasks: List[Dict[str, Any]]) -> Dict[str, int]:
-        """
-        Calculate the depth of each task in the dependency tree.
-        
-        Args:
-            subtasks: List of subtask dictionaries
-            
-        Returns:
-            Dictionary mapping task_id to depth
-        """
-        depths = {}
-        in_degree_copy = self.in_degree.copy()
-        
-        # BFS to calculate depths
-        queue = deque([(node, 0) for node in in_degree_copy if in_degree_copy[node] == 0])
-        
-        while queue:
-            node, depth = queue.popleft()
-            depths[node] = depth
-            
-            for neighbor in self.graph[node]:
-                in_degree_copy[neighbor] -= 1
-                if in_degree_copy[neighbor] == 0:
-                    queue.append((neighbor, depth + 1))
-        
-        return depths
-    
     def get_ready_tasks(self, completed_tasks: Set[str], subtasks: List[Dict[str, Any]]) -> List[str]:
         """
         Get tasks that are ready to execute based on completed tasks.
         
+        Each task is checked with a single AND of its dependency mask
+        against the mask of completed tasks. The masks from build_graph()
+        are reused only for the same `subtasks` list; any other list is
+        indexed afresh. Pass a new list rather than editing one in place.
+        
         Args:
             completed_tasks: Set of completed task IDs
             subtasks: List of all subtasks
@@ -212,7 +164,17 @@ class DependencyMapper:
         """
         ready = []
         
-        for task in subtasks:
+        cached = self._ready_masks
+        if cached is not None and cached[0] is subtasks:
+            _, bits, deps_masks = cached
+        else:
+            _, bits, deps_masks = self._index_dependencies(subtasks)
+        
+        completed_mask = 0
+        for task_id in completed_tasks:
+            completed_mask |= bits.get(task_id, 0)
+        
+        for task, deps_mask in zip(subtasks, deps_masks):
             task_id = task['id']
             
             # Skip if already completed
@@ -220,8 +182,7 @@ class DependencyMapper:
                 continue
             
             # Check if all dependencies are satisfied
-            dependencies = task.get('dependencies', [])
-            if all(dep in completed_tasks for dep in dependencies):
+            if deps_mask & ~completed_mask == 0:
                 ready.append(task_id)
         
         return ready
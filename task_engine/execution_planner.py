@@ -9,6 +9,7 @@ Responsibilities:
 """
 
 from typing import Dict, List, Any, Optional, Set
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -51,6 +52,8 @@ class ExecutionPlanner:
         """Initialize the execution planner."""
         self.current_plan = None
         self.task_status = {}
+        self._layers = []  # task IDs per step, in execution order
+        self._layer_cursor = 0  # first step that may still have pending tasks
     
     def create_plan(self, dependency_map: Dict[str, Any], subtasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -116,12 +119,17 @@ class ExecutionPlanner:
         }
         
         self.current_plan = plan
+        self._layers = [step.tasks for step in steps]
+        self._layer_cursor = 0
         return plan
     
     def get_next_tasks(self, completed_tasks: Set[str]) -> List[str]:
         """
         Get next tasks to execute based on completed tasks.
         
+        Completed tasks are expected to only grow while a plan runs, so
+        steps found fully completed are skipped on later calls.
+        
         Args:
             completed_tasks: Set of completed task IDs
             
@@ -131,21 +139,17 @@ class ExecutionPlanner:
         if not self.current_plan:
             return []
         
-        next_tasks = []
-        
-        for step in self.current_plan['steps']:
-            # Check if all tasks in previous steps are completed
-            step_tasks = step['tasks']
-            
-            # Get tasks that haven't been completed
-            pending_in_step = [t for t in step_tasks if t not in completed_tasks]
+        while self._layer_cursor < len(self._layers):
+            # Get tasks in this step that haven't been completed
+            pending_in_step = [t for t in self._layers[self._layer_cursor] if t not in completed_tasks]
             
             if pending_in_step:
                 # This is the next step to execute
-                next_tasks = pending_in_step
-                break
+                return pending_in_step
+            
+            self._layer_cursor += 1
         
-        return next_tasks
+        return []
     
     def update_task_status(self, task_id: str, status: TaskStatus) -> None:
         """
@@ -175,10 +179,11 @@ class ExecutionPlanner:
             }
         
         total = len(self.task_status)
-        completed = sum(1 for s in self.task_status.values() if s == TaskStatus.COMPLETED)
-        running = sum(1 for s in self.task_status.values() if s == TaskStatus.RUNNING)
-        pending = sum(1 for s in self.task_status.values() if s == TaskStatus.PENDING)
-        failed = sum(1 for s in self.task_status.values() if s == TaskStatus.FAILED)
+        status_counts = Counter(self.task_status.values())
+        completed = status_counts[TaskStatus.COMPLETED]
+        running = status_counts[TaskStatus.RUNNING]
+        pending = status_counts[TaskStatus.PENDING]
+        failed = status_counts[TaskStatus.FAILED]
         
         progress = (completed / total * 100) if total > 0 else 0.0
         
@@ -230,33 +235,37 @@ class ExecutionPlanner:
         """
         # Build task duration map
         task_duration = {}
+        predecessors = {}
         for task in subtasks:
             complexity = task.get('estimated_complexity', 'simple')
             duration = {'simple': 5, 'medium': 15, 'complex': 30}.get(complexity, 5)
             task_duration[task['id']] = duration
+            predecessors[task['id']] = task.get('dependencies', [])
         
-        # Calculate longest path using dynamic programming
+        # Longest path by dynamic programming over the topological order:
+        # finish[v] = duration[v] + max(finish[u] for u in predecessors[v])
         execution_order = dependency_map.get('execution_order', [])
-        graph = dependency_map.get('graph', {})
         
-        # Distance from start
-        dist = {task_id: 0 for task_id in execution_order}
-        predecessor = {task_id: None for task_id in execution_order}
+        finish = {}
+        predecessor = {}
         
-        # Process in topological order
         for task_id in execution_order:
-            current_dist = dist[task_id] + task_duration.get(task_id, 5)
+            best_dist = 0
+            best_pred = None
+            for dep in predecessors.get(task_id, []):
+                dep_finish = finish.get(dep)
+                if dep_finish is not None and dep_finish > best_dist:
+                    best_dist = dep_finish
+                    best_pred = dep
             
-            for next_task in graph.get(task_id, []):
-                if current_dist > dist[next_task]:
-                    dist[next_task] = current_dist
-                    predecessor[next_task] = task_id
+            finish[task_id] = best_dist + task_duration.get(task_id, 5)
+            predecessor[task_id] = best_pred
         
-        # Find task with maximum distance (end of critical path)
-        if not dist:
+        # Task that finishes last is the end of the critical path
+        if not finish:
             return []
         
-        end_task = max(dist, key=dist.get)
+        end_task = max(finish, key=finish.get)
         
         # Backtrack to find critical path
         path = []
@@ -8,9 +8,15 @@ Responsibilities:
 - Determine if task needs decomposition
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set
 from enum import Enum
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 
 class TaskComplexity(Enum):
     """Task complexity levels"""
@@ -47,6 +53,39 @@ class TaskAnalyzer:
             'data': ['data', 'analyze', 'dashboard'],
             'testing': ['test', 'qa']
         }
+        
+        self.action_verbs = ['create', 'build', 'develop', 'design', 'implement',
+                             'deploy', 'test', 'analyze', 'integrate', 'configure']
+        
+        self._keywords = self._collect_keywords()
+        self._automaton = self._build_automaton() if AHOCORASICK_AVAILABLE else None
+    
+    def _collect_keywords(self) -> Set[str]:
+        """Collect every keyword the analyzer looks for."""
+        keywords = set(self.action_verbs)
+        for table in (self.complexity_keywords, self.domain_keywords, self.priority_keywords):
+            for group in table.values():
+                keywords.update(group)
+        return keywords
+    
+    def _build_automaton(self):
+        """Build one Aho-Corasick automaton over all keywords."""
+        automaton = ahocorasick.Automaton()
+        for keyword in self._keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    
+    def _find_keywords(self, task_text: str) -> Set[str]:
+        """
+        Find all keywords occurring in the text in a single pass.
+        
+        Matches are substring matches, so overlapping keywords
+        (e.g. 'test' and 'testing') are all reported.
+        """
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(task_text)}
+        return {keyword for keyword in self._keywords if keyword in task_text}
     
     def analyze(self, task_description: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -66,12 +105,13 @@ class TaskAnalyzer:
         """
         context = context or {}
         task_lower = task_description.lower()
+        found = self._find_keywords(task_lower)
         
         # Determine complexity
-        complexity = self._determine_complexity(task_lower)
+        complexity = self._determine_complexity(found)
         
         # Identify domains
-        domains = self._identify_domains(task_lower)
+        domains = self._identify_domains(found)
         
         # Extract key requirements
         requirements = self._extract_requirements(task_description)
@@ -80,7 +120,7 @@ class TaskAnalyzer:
         requires_decomposition = complexity in [TaskComplexity.MEDIUM, TaskComplexity.COMPLEX]
         
         # Estimate subtasks
-        estimated_subtasks = self._estimate_subtasks(complexity, task_lower)
+        estimated_subtasks = self._estimate_subtasks(complexity, found)
         
         return {
             'complexity': complexity,
@@ -92,29 +132,15 @@ class TaskAnalyzer:
             'context': context
         }
     
-    def _determine_complexity(self, task_text: str) -> TaskComplexity:
+    def _determine_complexity(self, found: Set[str]) -> TaskComplexity:
         """Determine task complexity based on keywords and structure."""
         # Count complexity indicators
-        complex_score = 0
-        medium_score = 0
-        simple_score = 0
-        
-        for keyword in self.complexity_keywords['complex']:
-            if keyword in task_text:
-                complex_score += 1
-        
-        for keyword in self.complexity_keywords['medium']:
-            if keyword in task_text:
-                medium_score += 1
-        
-        for keyword in self.complexity_keywords['simple']:
-            if keyword in task_text:
-                simple_score += 1
+        complex_score = sum(1 for kw in self.complexity_keywords['complex'] if kw in found)
+        medium_score = sum(1 for kw in self.complexity_keywords['medium'] if kw in found)
+        simple_score = sum(1 for kw in self.complexity_keywords['simple'] if kw in found)
         
         # Check for multiple action verbs
-        action_verbs = ['create', 'build', 'develop', 'design', 'implement', 
-                       'deploy', 'test', 'analyze', 'integrate', 'configure']
-        action_count = sum(1 for verb in action_verbs if verb in task_text)
+        action_count = sum(1 for verb in self.action_verbs if verb in found)
         
         # Determine complexity
         if complex_score > 0 or action_count > 3:
@@ -129,15 +155,12 @@ class TaskAnalyzer:
         else:
             return TaskComplexity.SIMPLE
     
-    def _identify_domains(self, task_text: str) -> List[str]:
+    def _identify_domains(self, found: Set[str]) -> List[str]:
         """Identify relevant domains/skills needed for the task."""
         domain_scores = {}
         
         for domain, keywords in self.domain_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in task_text:
-                    score += 1
+            score = sum(1 for keyword in keywords if keyword in found)
             if score > 0:
                 domain_scores[domain] = score
         
@@ -145,7 +168,7 @@ class TaskAnalyzer:
         for domain, priority_kws in self.priority_keywords.items():
             if domain in domain_scores:
                 for kw in priority_kws:
-                    if kw in task_text:
+                    if kw in found:
                         domain_scores[domain] += 0.5  # Add half point for priority
                         break
         
@@ -168,7 +191,7 @@ class TaskAnalyzer:
         
         return requirements[:10]  # Limit to 10 requirements
     
-    def _estimate_subtasks(self, complexity: TaskComplexity, task_text: str) -> int:
+    def _estimate_subtasks(self, complexity: TaskComplexity, found: Set[str]) -> int:
         """Estimate number of subtasks needed."""
         base_counts = {
             TaskComplexity.SIMPLE: 1,
@@ -179,8 +202,6 @@ class TaskAnalyzer:
         base = base_counts[complexity]
         
         # Adjust based on action verbs
-        action_verbs = ['create', 'build', 'develop', 'design', 'implement', 
-                       'deploy', 'test', 'analyze', 'integrate', 'configure']
-        action_count = sum(1 for verb in action_verbs if verb in task_text)
+        action_count = sum(1 for verb in self.action_verbs if verb in found)
         
         return min(base + action_count, 10)  # Cap at 10 subtasks
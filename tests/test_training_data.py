@@ -0,0 +1,112 @@
+"""
+Tests for the fine-tuning data generator
+"""
+
+import json
+import random
+import pytest
+from training.generate_training_data import (
+    _GREETING_PAIRS,
+    _SHORT_EXCHANGE_CUM_WEIGHTS,
+    _SHORT_EXCHANGE_VARIANTS,
+    CONFIG_DIR,
+    NUMPY_MIN_DRAWS,
+    OUTPUT_FORMATS,
+    PersonalityExtractor,
+    TrainingDataGenerator,
+    TrainingExample,
+    _dumps,
+)
+
+
+@pytest.fixture(scope="module")
+def personality():
+    """Personality loaded from the repo config"""
+    return PersonalityExtractor(
+        CONFIG_DIR / "brain_clone.yaml",
+        CONFIG_DIR / "engrams" / "abby_starchild_engram.yaml",
+    )
+
+
+@pytest.fixture
+def generator(personality):
+    """Fresh generator per test"""
+    return TrainingDataGenerator(personality)
+
+
+class TestTrainingDataGenerator:
+    """Test TrainingDataGenerator"""
+
+    def test_generate_all(self, generator):
+        """Test every example carries the system prompt"""
+        examples = generator.generate_all(200)
+
+        assert examples
+        assert all(ex.instruction == generator._create_system_prompt() for ex in examples)
+
+    def test_generate_all_dedup(self, generator):
+        """Test dedup keeps one example per (input, output, category)"""
+        examples = generator.generate_all(1000, dedup=True)
+        keys = [(ex.input, ex.output, ex.category) for ex in examples]
+
+        assert len(keys) == len(set(keys))
+        assert len(examples) < 1000
+
+    def test_save_all_formats(self, generator, tmp_path):
+        """Test one save writes every format with one line per example"""
+        generator.generate_all(200)
+        generator.save(tmp_path / "abby", "all")
+
+        total = len(generator.examples)
+        alpaca = (tmp_path / "abby.alpaca.jsonl").read_text(encoding="utf-8").splitlines()
+        sharegpt = (tmp_path / "abby.sharegpt.jsonl").read_text(encoding="utf-8").splitlines()
+        openai = (tmp_path / "abby.openai.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(alpaca) == len(sharegpt) == len(openai) == total
+
+        first = generator.examples[0]
+        assert json.loads(alpaca[0]) == first.to_alpaca()
+        assert json.loads(sharegpt[0]) == first.to_sharegpt()
+        assert json.loads(openai[0]) == first.to_openai()
+
+        meta = json.loads((tmp_path / "abby.meta.json").read_text(encoding="utf-8"))
+        assert meta["total_examples"] == total
+        assert sum(meta["categories"].values()) == total
+
+    def test_save_single_format(self, generator, tmp_path):
+        """Test saving one format writes only that file"""
+        generator.generate_all(100)
+        generator.save(tmp_path / "abby", "sharegpt")
+
+        assert (tmp_path / "abby.sharegpt.jsonl").exists()
+        assert not (tmp_path / "abby.alpaca.jsonl").exists()
+        assert not (tmp_path / "abby.openai.jsonl").exists()
+
+
+@pytest.mark.parametrize("fmt", sorted(OUTPUT_FORMATS))
+@pytest.mark.parametrize("instruction", ["", 'You are "Abby".\nBe brief. 😀'])
+def test_line_writer_matches_format_dict(fmt, instruction):
+    """Test the spliced JSONL lines match serializing the to_* dicts"""
+    ex = TrainingExample(instruction, "hey\tthere", 'Hi! "quoted" \\ ü', "greeting")
+    to_line = OUTPUT_FORMATS[fmt][2]
+
+    assert to_line(ex, _dumps(instruction)) == _dumps(getattr(ex, f"to_{fmt}")()) + b"\n"
+
+
+@pytest.mark.parametrize("table,cum_weights", [
+    (_GREETING_PAIRS, None),
+    (_SHORT_EXCHANGE_VARIANTS, _SHORT_EXCHANGE_CUM_WEIGHTS),
+], ids=["uniform", "weighted"])
+def test_draw_large_counts(personality, table, cum_weights):
+    """Test draws above NUMPY_MIN_DRAWS return table rows, reproducibly under random.seed"""
+    count = NUMPY_MIN_DRAWS * 4
+
+    def draw(seed):
+        random.seed(seed)
+        return TrainingDataGenerator(personality)._draw(table, count, cum_weights)
+
+    rows = draw(42)
+    assert len(rows) == count
+    assert all(type(row) is tuple and all(type(field) is str for field in row) for row in rows)
+    assert set(rows) <= set(table)
+    assert draw(42) == rows
+    assert draw(43) != rows
@@ -11,35 +11,78 @@ Tests:
 
 import os
 import sys
+import functools
+import threading
 from pathlib import Path
 
 # Add parent to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+PROJECT_ROOT = str(Path(__file__).parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 import re
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
-import yaml
+
+try:
+    from ollama_integration.client import OllamaClient
+    OLLAMA_IMPORT_ERROR = None
+except ImportError as e:
+    OllamaClient = None
+    OLLAMA_IMPORT_ERROR = e
+
+try:
+    from streaming_conversation import get_streaming_conversation
+    STREAMING_IMPORT_ERROR = None
+except ImportError as e:
+    get_streaming_conversation = None
+    STREAMING_IMPORT_ERROR = e
+
+
+# Common greeting openers, used to spot repetitive responses
+GREETING_PATTERN = re.compile(r"^(Hey(?:\s+there)?!?|Hi(?:\s+there)?!?|Hello!?)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_source(path: str, mtime: float) -> bytes:
+    """Read a source file, cached until its modification time changes"""
+    return Path(path).read_bytes()
 
 
 class ResponseQualityDiagnostics:
     """Diagnose and fix response quality issues"""
     
+    __slots__ = ('issues', 'fixes', '_client', '_client_lock')
+    
     def __init__(self):
         self.issues = []
         self.fixes = []
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """Ollama client shared by all probes, so they reuse one HTTP session"""
+        if OllamaClient is None:
+            raise RuntimeError(f"import failed: {OLLAMA_IMPORT_ERROR}")
+        with self._client_lock:
+            if self._client is None:
+                self._client = OllamaClient()
+        return self._client
         
     def check_ollama_connection(self) -> Tuple[bool, str]:
         """Check if Ollama is running and responsive"""
         try:
-            from ollama_integration.client import OllamaClient
-            client = OllamaClient()
+            client = self.client
             
-            # Test with simple prompt
+            # Test with simple prompt. This also loads the model, so keep it
+            # resident for the instruction and context probes that follow.
             result = client.generate(
                 prompt="Say 'OK'",
                 model="mistral:latest",
-                options={"num_predict": 5, "temperature": 0.1}
+                options={"num_predict": 5, "temperature": 0.1},
+                keep_alive="5m"
             )
             
             response = result.get('response', '')
@@ -57,24 +100,23 @@ class ResponseQualityDiagnostics:
         
         # Read streaming_conversation.py system prompt
         try:
-            from streaming_conversation import get_streaming_conversation_instance
             # The system prompt is embedded in the code
             # Let's check what it says
-            with open("streaming_conversation.py", 'r') as f:
-                content = f.read()
+            path = "streaming_conversation.py"
+            content = _read_source(path, os.path.getmtime(path))
                 
             # Look for system prompt section
-            if "NEVER repeat yourself" in content:
+            if content.find(b"NEVER repeat yourself") != -1:
                 print("✓ Anti-repetition rule found")
             else:
                 issues.append("Missing anti-repetition rule in system prompt")
                 
-            if "Match the user's energy" in content:
+            if content.find(b"Match the user's energy") != -1:
                 print("✓ Context matching rule found")
             else:
                 issues.append("Missing context matching rule")
                 
-            if "1-2 sentences MAX" in content:
+            if content.find(b"1-2 sentences MAX") != -1:
                 print("✓ Brevity rule found")
             else:
                 issues.append("Missing brevity constraint")
@@ -86,17 +128,20 @@ class ResponseQualityDiagnostics:
     
     def check_conversation_history(self) -> Tuple[bool, str]:
         """Check if conversation history is being maintained"""
+        if get_streaming_conversation is None:
+            return False, f"History check error: import failed: {STREAMING_IMPORT_ERROR}"
+        
         try:
-            from streaming_conversation import get_streaming_conversation_instance
-            sc = get_streaming_conversation_instance()
+            sc = get_streaming_conversation()
             
             # Check if history exists
-            if not hasattr(sc, 'conversation_history'):
+            try:
+                history = sc.conversation_history
+            except AttributeError:
                 return False, "No conversation_history attribute found"
                 
-            history = sc.conversation_history
             if not isinstance(history, list):
-                return False, f"conversation_history is not a list: {type(history)}"
+                return False, f"conversation_history is not a list: {type(history).__name__}"
                 
             return True, f"History OK ({len(history)} turns)"
             
@@ -108,25 +153,20 @@ class ResponseQualityDiagnostics:
         if not responses:
             return True, {"status": "no responses to check"}
             
-        # Extract greeting patterns
-        greeting_patterns = []
-        for r in responses:
-            # Look for common greeting starts
-            match = re.match(r"^(Hey\s*(?:there)?!?|Hi\s*(?:there)?!?|Hello!?)\s*", r, re.IGNORECASE)
-            if match:
-                greeting_patterns.append(match.group(0).strip().lower())
-        
-        # Count patterns
-        pattern_counts = Counter(greeting_patterns)
+        # Count greeting starts
+        pattern_counts = Counter(
+            match.group(0).casefold()
+            for match in map(GREETING_PATTERN.match, responses)
+            if match
+        )
         
         # Check for over-repetition
         total = len(responses)
         issues = {}
         
         for pattern, count in pattern_counts.most_common(5):
-            ratio = count / total
-            if ratio > 0.3:  # More than 30% same greeting = problem
-                issues[pattern] = f"{count}/{total} ({ratio:.0%})"
+            if count * 10 > total * 3:  # More than 30% same greeting = problem
+                issues[pattern] = f"{count}/{total} ({count / total:.0%})"
         
         if issues:
             return False, {"repetitive_patterns": issues}
@@ -135,8 +175,7 @@ class ResponseQualityDiagnostics:
     def test_model_instruction_following(self) -> Tuple[bool, str]:
         """Test if the model follows instructions properly"""
         try:
-            from ollama_integration.client import OllamaClient
-            client = OllamaClient()
+            client = self.client
             
             test_prompt = """You are a test assistant.
 
@@ -166,8 +205,7 @@ User: What should you say?"""
     def test_context_awareness(self) -> Tuple[bool, str]:
         """Test if model understands context from conversation history"""
         try:
-            from ollama_integration.client import OllamaClient
-            client = OllamaClient()
+            client = self.client
             
             messages = [
                 {"role": "system", "content": "You are a helpful assistant. Answer questions based on the conversation."},
@@ -200,44 +238,62 @@ User: What should you say?"""
         
         results = {}
         
-        # Test 1: Ollama connection
-        print("1. Testing Ollama connection...")
-        ok, msg = self.check_ollama_connection()
-        results['ollama'] = {'passed': ok, 'message': msg}
-        print(f"   {'✓' if ok else '✗'} {msg}")
-        print()
-        
-        # Test 2: System prompt quality
-        print("2. Checking system prompt quality...")
-        ok, issues = self.check_system_prompt_quality()
-        results['system_prompt'] = {'passed': ok, 'issues': issues}
-        if ok:
-            print("   ✓ System prompts look good")
-        else:
-            for issue in issues:
-                print(f"   ✗ {issue}")
-        print()
-        
-        # Test 3: Conversation history
-        print("3. Checking conversation history...")
-        ok, msg = self.check_conversation_history()
-        results['history'] = {'passed': ok, 'message': msg}
-        print(f"   {'✓' if ok else '✗'} {msg}")
-        print()
-        
-        # Test 4: Instruction following
-        print("4. Testing instruction following...")
-        ok, msg = self.test_model_instruction_following()
-        results['instruction_following'] = {'passed': ok, 'message': msg}
-        print(f"   {'✓' if ok else '✗'} {msg}")
-        print()
-        
-        # Test 5: Context awareness
-        print("5. Testing context awareness...")
-        ok, msg = self.test_context_awareness()
-        results['context_awareness'] = {'passed': ok, 'message': msg}
-        print(f"   {'✓' if ok else '✗'} {msg}")
-        print()
+        # The model probes spend their time waiting on the network, so they run
+        # in the background while the local checks run on this thread. Results
+        # are still collected and printed in the usual order.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Test 1: Ollama connection
+            print("1. Testing Ollama connection...")
+            ollama_ok, msg = self.check_ollama_connection()
+            results['ollama'] = {'passed': ollama_ok, 'message': msg}
+            print(f"   {'✓' if ollama_ok else '✗'} {msg}")
+            print()
+            
+            # The model probes can only fail without Ollama, each after
+            # waiting out its own timeout, so skip them instead
+            if ollama_ok:
+                instruction_future = executor.submit(self.test_model_instruction_following)
+                context_future = executor.submit(self.test_context_awareness)
+            else:
+                instruction_future = context_future = None
+            
+            # Test 2: System prompt quality
+            print("2. Checking system prompt quality...")
+            ok, issues = self.check_system_prompt_quality()
+            results['system_prompt'] = {'passed': ok, 'issues': issues}
+            if ok:
+                print("   ✓ System prompts look good")
+            else:
+                for issue in issues:
+                    print(f"   ✗ {issue}")
+            print()
+            
+            # Test 3: Conversation history
+            print("3. Checking conversation history...")
+            ok, msg = self.check_conversation_history()
+            results['history'] = {'passed': ok, 'message': msg}
+            print(f"   {'✓' if ok else '✗'} {msg}")
+            print()
+            
+            # Test 4: Instruction following
+            print("4. Testing instruction following...")
+            if instruction_future:
+                ok, msg = instruction_future.result()
+            else:
+                ok, msg = False, "Skipped: Ollama unavailable"
+            results['instruction_following'] = {'passed': ok, 'message': msg}
+            print(f"   {'✓' if ok else '✗'} {msg}")
+            print()
+            
+            # Test 5: Context awareness
+            print("5. Testing context awareness...")
+            if context_future:
+                ok, msg = context_future.result()
+            else:
+                ok, msg = False, "Skipped: Ollama unavailable"
+            results['context_awareness'] = {'passed': ok, 'message': msg}
+            print(f"   {'✓' if ok else '✗'} {msg}")
+            print()
         
         # Summary
         print("=" * 60)
@@ -252,12 +308,16 @@ User: What should you say?"""
         
         if passed < total:
             print("RECOMMENDATIONS:")
-            if not results['instruction_following']['passed']:
+            if not ollama_ok:
+                print("- Ollama is not responding, model tests were skipped")
+                print("  → Start Ollama (ollama serve) and check mistral:latest is pulled")
+                
+            elif not results['instruction_following']['passed']:
                 print("- Model is not following instructions well")
                 print("  → Consider using a stronger model (qwen3-coder) for conversation")
                 print("  → Or add more explicit instruction reinforcement")
                 
-            if not results['context_awareness']['passed']:
+            if ollama_ok and not results['context_awareness']['passed']:
                 print("- Model is losing conversation context")
                 print("  → Check that conversation history is being passed to model")
                 print("  → Verify the history format matches expected schema")
@@ -8,76 +8,370 @@ Usage:
     python training/finetune_abby.py
     python training/finetune_abby.py --base-model mistralai/Mistral-7B-Instruct-v0.2
     python training/finetune_abby.py --quantize 4  # 4-bit quantization
+    python training/finetune_abby.py --precision fp16  # force fp16 mixed precision
+    python training/finetune_abby.py --optim adafactor  # pick the optimizer
+    python training/finetune_abby.py --gradient-checkpointing-interval 2  # trade VRAM for speed
+    python training/finetune_abby.py --no-packing  # one conversation per sequence
+    python training/finetune_abby.py --dataset-cache-dir training/.cache  # reuse the Arrow copy
+    python training/finetune_abby.py --merge-after-training  # train, then merge in memory
+    python training/finetune_abby.py --no-compile  # skip torch.compile (standard path)
+    python training/finetune_abby.py --no-resume  # start over despite existing checkpoints
+    python training/finetune_abby.py --effective-batch-size 16  # derive gradient accumulation
 """
 
 import argparse
+import hashlib
+import json
 import os
+import re
+import shutil
 import sys
+from functools import wraps
+from importlib.metadata import PackageNotFoundError, version
+from importlib.util import find_spec
 from pathlib import Path
 from typing import Optional
 
+# Training dependencies. Only their presence is checked here, so --help and
+# --merge don't pay for importing torch/transformers; each code path imports
+# what it uses.
+UNSLOTH_AVAILABLE = find_spec("unsloth") is not None
+TORCH_AVAILABLE = find_spec("torch") is not None
+TRANSFORMERS_AVAILABLE = find_spec("transformers") is not None
+DATASETS_AVAILABLE = find_spec("datasets") is not None
+PEFT_AVAILABLE = find_spec("peft") is not None
+TRL_AVAILABLE = find_spec("trl") is not None
+BNB_AVAILABLE = find_spec("bitsandbytes") is not None
+
+
+def package_version(name: str) -> str:
+    """Installed version from package metadata, without touching the module"""
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
 # Check for required packages
-def check_dependencies():
-    """Check if training dependencies are installed"""
+def check_training_deps():
+    """Check the packages training needs and pick the trainer ("unsloth" or "standard")"""
     missing = []
     
-    try:
+    # Unsloth patches transformers, so it has to be imported first. It also
+    # raises non-ImportErrors (e.g. without a supported GPU); fall back then.
+    unsloth_usable = False
+    if UNSLOTH_AVAILABLE:
+        try:
+            import unsloth  # noqa: F401
+            unsloth_usable = True
+        except Exception as e:
+            print(f"  ⚠️ Unsloth failed to import ({e})")
+    
+    if TORCH_AVAILABLE:
         import torch
-        print(f"✓ PyTorch {torch.__version__}")
+        print(f"✓ PyTorch {package_version('torch')}")
         if torch.cuda.is_available():
             print(f"  CUDA available: {torch.cuda.get_device_name(0)}")
         elif hasattr(torch, 'hip') and torch.cuda.is_available():
             print(f"  ROCm/HIP available")
         else:
             print("  ⚠️ No GPU detected - training will be SLOW")
-    except ImportError:
+    else:
         missing.append("torch")
     
-    try:
-        import transformers
-        print(f"✓ Transformers {transformers.__version__}")
-    except ImportError:
-        missing.append("transformers")
-    
-    try:
-        import datasets
-        print(f"✓ Datasets {datasets.__version__}")
-    except ImportError:
-        missing.append("datasets")
-    
-    try:
-        import peft
-        print(f"✓ PEFT {peft.__version__}")
-    except ImportError:
-        missing.append("peft")
-    
-    try:
-        import trl
-        print(f"✓ TRL {trl.__version__}")
-    except ImportError:
-        missing.append("trl")
+    for label, package, available in (
+        ("Transformers", "transformers", TRANSFORMERS_AVAILABLE),
+        ("Datasets", "datasets", DATASETS_AVAILABLE),
+        ("PEFT", "peft", PEFT_AVAILABLE),
+        ("TRL", "trl", TRL_AVAILABLE),
+    ):
+        if available:
+            print(f"✓ {label} {package_version(package)}")
+        else:
+            missing.append(package)
     
-    try:
-        import bitsandbytes
-        print(f"✓ bitsandbytes {bitsandbytes.__version__}")
-    except ImportError:
+    if BNB_AVAILABLE:
+        print(f"✓ bitsandbytes {package_version('bitsandbytes')}")
+    else:
         print("  ⚠️ bitsandbytes not found (optional, for quantization)")
     
-    try:
-        from unsloth import FastLanguageModel
-        print("✓ Unsloth available (recommended)")
+    if unsloth_usable:
+        print(f"✓ Unsloth {package_version('unsloth')} (recommended)")
         return "unsloth"
-    except ImportError:
-        print("  ⚠️ Unsloth not found (will use standard training)")
+    print("  ⚠️ Unsloth not available (will use standard training)")
     
     if missing:
         print(f"\n❌ Missing packages: {', '.join(missing)}")
-        print("Install with: pip install torch transformers datasets peft trl")
+        print("Install PyTorch for your GPU, then: pip install -r training/requirements.txt")
         sys.exit(1)
     
     return "standard"
 
 
+def check_merge_deps():
+    """Check the packages --merge needs and pick the merger ("unsloth" or "standard")"""
+    if UNSLOTH_AVAILABLE:
+        try:
+            import unsloth  # noqa: F401
+            print(f"✓ Unsloth {package_version('unsloth')} (recommended)")
+            return "unsloth"
+        except Exception as e:
+            print(f"  ⚠️ Unsloth failed to import ({e})")
+    
+    missing = [package for package, available in (
+        ("transformers", TRANSFORMERS_AVAILABLE),
+        ("peft", PEFT_AVAILABLE),
+    ) if not available]
+    if missing:
+        print(f"\n❌ Missing packages: {', '.join(missing)}")
+        print("Install with: pip install transformers peft")
+        sys.exit(1)
+    print(f"✓ Transformers {package_version('transformers')}")
+    print(f"✓ PEFT {package_version('peft')}")
+    return "standard"
+
+
+def resolve_precision(precision: str) -> str:
+    """Resolve 'auto' to bf16 when the GPU supports it (RDNA3 does), else fp16"""
+    if precision != "auto":
+        return precision
+    
+    import torch
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return "bf16"
+    return "fp16"
+
+
+def resolve_optim(optim: str, quantize: int) -> str:
+    """Resolve 'auto' to paged 8-bit AdamW for quantized runs, fused AdamW otherwise"""
+    if optim != "auto":
+        return optim
+    return "adamw_torch_fused" if quantize == 16 else "paged_adamw_8bit"
+
+
+def resolve_grad_accum(grad_accum_steps: int, effective_batch_size: Optional[int], batch_size: int) -> int:
+    """Gradient accumulation steps, derived from the effective batch size when one is given
+    
+    Effective batch = batch_size * accumulation steps * processes. More
+    accumulation spreads each optimizer step over more forward/backward passes.
+    """
+    if effective_batch_size is None:
+        return grad_accum_steps
+    world_size = int(os.environ.get("WORLD_SIZE", 1))
+    return max(1, effective_batch_size // (batch_size * world_size))
+
+
+def dataloader_args() -> dict:
+    """TrainingArguments for background collation in persistent worker processes"""
+    workers = min(4, (os.cpu_count() or 1) // 2)
+    if not workers:
+        return {"dataloader_pin_memory": True}
+    return {
+        "dataloader_num_workers": workers,
+        "dataloader_pin_memory": True,
+        "dataloader_persistent_workers": True,
+        "dataloader_prefetch_factor": 4,
+    }
+
+
+# ShareGPT speaker -> ChatML role
+CHATML_ROLES = {"system": "system", "human": "user", "gpt": "assistant"}
+
+
+def format_prompt(conversations) -> str:
+    """Format a ShareGPT conversation as ChatML text"""
+    parts = []
+    for turn in conversations or ():
+        role = CHATML_ROLES.get(turn["from"])
+        if role:
+            parts.append(f"<|im_start|>{role}\n{turn['value']}<|im_end|>\n")
+    return "".join(parts)
+
+
+def source_key(training_data: str) -> str:
+    """Cache key for the JSONL file: its resolved path and exact mtime"""
+    path = Path(training_data).resolve()
+    return f"{path}|{path.stat().st_mtime_ns}"
+
+
+def cache_path_for(cache_dir: str, training_data: str, kind: str, key: str) -> Path:
+    """Cache directory for one kind of cache of training_data, named after a digest of key
+    
+    Names look like {stem}-{path digest}-{kind}-{key digest}, so every cache
+    of the same file and kind shares a prefix up to the key digest.
+    """
+    path = Path(training_data).resolve()
+    path_digest = hashlib.sha1(str(path).encode()).hexdigest()[:8]
+    key_digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return Path(cache_dir) / f"{path.stem}-{path_digest}-{kind}-{key_digest}"
+
+
+def remove_stale_caches(cache_path: Path):
+    """Delete caches of the same file and kind as cache_path that have another key digest"""
+    prefix = cache_path.name[:-12]
+    for sibling in cache_path.parent.glob(f"{prefix}*"):
+        if sibling != cache_path and re.fullmatch(r"[0-9a-f]{12}", sibling.name[len(prefix):]):
+            shutil.rmtree(sibling, ignore_errors=True)
+
+
+def load_training_dataset(training_data: str, cache_dir: Optional[str] = None):
+    """Load the JSONL training data, via a memory-mapped Arrow copy when cache_dir is set
+    
+    The Arrow copy is keyed on the file's resolved path and mtime, so a
+    different or modified file never reuses it. Writing a new copy removes
+    the file's older ones.
+    """
+    from datasets import Dataset, load_dataset, load_from_disk
+    
+    if not cache_dir:
+        return load_dataset("json", data_files=training_data, split="train")
+    
+    cache_path = cache_path_for(cache_dir, training_data, "arrow", source_key(training_data))
+    if not (cache_path / "dataset_info.json").exists():
+        print(f"   Caching dataset as Arrow in {cache_path}...")
+        Dataset.from_json(training_data).save_to_disk(str(cache_path))
+        remove_stale_caches(cache_path)
+    return load_from_disk(str(cache_path))
+
+
+def tokenize_dataset(dataset, tokenizer, max_seq_length: int, packing: bool = True):
+    """Format and tokenize examples in one parallel pass, instead of inside SFTTrainer
+    
+    With packing, conversations are joined with EOS and cut into
+    max_seq_length blocks so short examples don't train on padding.
+    """
+    def format_and_tokenize(batch):
+        texts = [format_prompt(conversations) for conversations in batch["conversations"]]
+        return tokenizer(texts, truncation=True, max_length=max_seq_length)
+    
+    def pack(batch):
+        ids = []
+        for input_ids in batch["input_ids"]:
+            ids.extend(input_ids)
+            ids.append(tokenizer.eos_token_id)
+        blocks = [ids[i:i + max_seq_length] for i in range(0, len(ids), max_seq_length)]
+        return {"input_ids": blocks, "attention_mask": [[1] * len(block) for block in blocks]}
+    
+    dataset = dataset.map(
+        format_and_tokenize,
+        batched=True,
+        num_proc=os.cpu_count(),
+        remove_columns=dataset.column_names,
+    )
+    if packing:
+        dataset = dataset.map(
+            pack,
+            batched=True,
+            num_proc=os.cpu_count(),
+            remove_columns=dataset.column_names,
+        )
+        print(f"   Packed into {len(dataset)} sequences of up to {max_seq_length} tokens")
+    return dataset
+
+
+def prepare_dataset(training_data: str, tokenizer, max_seq_length: int,
+                    packing: bool = True, cache_dir: Optional[str] = None):
+    """Load and tokenize the training data, reusing a cached result when cache_dir is set
+    
+    The tokenized cache is keyed on the JSONL path and mtime, tokenizer,
+    max_seq_length and packing, so a resumed run skips preprocessing entirely.
+    Only the newest tokenized cache of each file is kept.
+    """
+    from datasets import load_from_disk
+    
+    cache_path = None
+    if cache_dir:
+        key = f"{source_key(training_data)}|{tokenizer.name_or_path}|{max_seq_length}|{packing}"
+        cache_path = cache_path_for(cache_dir, training_data, "tokenized", key)
+        if (cache_path / "dataset_info.json").exists():
+            print(f"📊 Loading tokenized training data from {cache_path}...")
+            return load_from_disk(str(cache_path))
+    
+    print(f"📊 Loading training data from {training_data}...")
+    dataset = load_training_dataset(training_data, cache_dir)
+    print(f"   {len(dataset)} examples loaded")
+    
+    dataset = tokenize_dataset(dataset, tokenizer, max_seq_length, packing=packing)
+    if cache_path:
+        dataset.save_to_disk(str(cache_path))
+        remove_stale_caches(cache_path)
+    return dataset
+
+
+def checkpoint_every_nth_layer(model, interval: int):
+    """Recompute activations for every `interval`-th decoder layer only
+    
+    The remaining layers keep their activations, which uses more VRAM than
+    checkpointing every layer but skips most of the backward recompute.
+    """
+    import torch
+    from torch.utils.checkpoint import checkpoint
+    
+    def checkpointed(forward):
+        @wraps(forward)
+        def wrapper(*args, **kwargs):
+            if not torch.is_grad_enabled():
+                return forward(*args, **kwargs)
+            return checkpoint(forward, *args, use_reentrant=False, **kwargs)
+        return wrapper
+    
+    layers = model.get_base_model().model.layers
+    for layer in layers[::interval]:
+        layer.forward = checkpointed(layer.forward)
+    print(f"   Checkpointing {len(layers[::interval])}/{len(layers)} decoder layers")
+
+
+# Settings a checkpoint was trained with, saved next to the checkpoints
+RUN_CONFIG_FILE = "run_config.json"
+
+
+def resolve_checkpoint(output_dir: str, resume: Optional[bool], run_config: dict) -> Optional[str]:
+    """Pick the checkpoint to resume from, or None to train from scratch
+    
+    --resume and --no-resume decide outright. By default the newest
+    checkpoint is resumed only if its run stopped before max_steps and used
+    the same settings and training data; a finished or different run is
+    started over. Checkpoints that are not resumed are removed, since
+    save_total_limit would otherwise rotate them in with the new run's.
+    """
+    output_path = Path(output_dir)
+    config_path = output_path / RUN_CONFIG_FILE
+    checkpoints = sorted(
+        output_path.glob("checkpoint-*"), key=lambda path: int(path.name.rsplit("-", 1)[-1])
+    )
+    
+    checkpoint = None
+    if not checkpoints:
+        reason = "no checkpoint found"
+    elif resume is False:
+        reason = "--no-resume"
+    elif resume:
+        checkpoint = checkpoints[-1]
+        reason = "--resume"
+    else:
+        state = json.loads((checkpoints[-1] / "trainer_state.json").read_text(encoding="utf-8"))
+        saved_config = (
+            json.loads(config_path.read_text(encoding="utf-8")) if config_path.exists() else None
+        )
+        if state["global_step"] >= state["max_steps"]:
+            reason = f"{checkpoints[-1].name} is from a finished run"
+        elif saved_config != run_config:
+            reason = f"{checkpoints[-1].name} was trained with other settings or data"
+        else:
+            checkpoint = checkpoints[-1]
+            reason = f"stopped at step {state['global_step']}/{state['max_steps']}"
+    
+    if checkpoint:
+        print(f"   Resuming from {checkpoint.name} ({reason})")
+    else:
+        print(f"   Training from scratch ({reason})")
+        if int(os.environ.get("RANK", 0)) == 0:
+            for stale in checkpoints:
+                shutil.rmtree(stale)
+            config_path.write_text(json.dumps(run_config, indent=2), encoding="utf-8")
+    return str(checkpoint) if checkpoint else None
+
+
 def train_with_unsloth(
     base_model: str,
     training_data: str,
@@ -86,26 +380,37 @@ def train_with_unsloth(
     lora_rank: int = 16,
     epochs: int = 3,
     batch_size: int = 2,
+    grad_accum_steps: int = 4,
     learning_rate: float = 2e-4,
     max_seq_length: int = 2048,
+    precision: str = "bf16",
+    optim: str = "paged_adamw_8bit",
+    packing: bool = True,
+    dataset_cache_dir: Optional[str] = None,
+    resume: Optional[bool] = None,
 ):
     """Fine-tune using Unsloth (fastest)"""
-    from unsloth import FastLanguageModel
-    from datasets import load_dataset
-    from trl import SFTTrainer
-    from transformers import TrainingArguments
-    
     print(f"\n🚀 Training with Unsloth")
     print(f"   Base model: {base_model}")
     print(f"   Quantization: {quantize}-bit")
     print(f"   LoRA rank: {lora_rank}")
     print(f"   Epochs: {epochs}")
+    print(f"   Batch: {batch_size} x {grad_accum_steps} accumulation steps")
+    print(f"   Precision: {precision}")
+    print(f"   Optimizer: {optim}")
+    
+    from unsloth import FastLanguageModel
+    import torch
+    from transformers import DataCollatorForLanguageModeling, TrainingArguments
+    from trl import SFTTrainer
     
-    # Load model
+    # Load model in the dtype TrainingArguments trains in, rather than letting
+    # Unsloth pick bf16 on its own
     print("\n📦 Loading model...")
     model, tokenizer = FastLanguageModel.from_pretrained(
         model_name=base_model,
         max_seq_length=max_seq_length,
+        dtype=torch.bfloat16 if precision == "bf16" else torch.float16,
         load_in_4bit=(quantize == 4),
         load_in_8bit=(quantize == 8),
     )
@@ -120,46 +425,32 @@ def train_with_unsloth(
         lora_alpha=lora_rank * 2,
         lora_dropout=0.05,
         bias="none",
-        use_gradient_checkpointing=True,
+        use_gradient_checkpointing="unsloth",  # offloads activations to CPU
         random_state=42,
     )
     
     # Load dataset
-    print(f"📊 Loading training data from {training_data}...")
-    dataset = load_dataset("json", data_files=training_data, split="train")
-    print(f"   {len(dataset)} examples loaded")
-    
-    # Format function for ShareGPT format
-    def format_prompt(example):
-        text = ""
-        for turn in example.get("conversations", []):
-            if turn["from"] == "system":
-                text += f"<|im_start|>system\n{turn['value']}<|im_end|>\n"
-            elif turn["from"] == "human":
-                text += f"<|im_start|>user\n{turn['value']}<|im_end|>\n"
-            elif turn["from"] == "gpt":
-                text += f"<|im_start|>assistant\n{turn['value']}<|im_end|>\n"
-        return {"text": text}
-    
-    dataset = dataset.map(format_prompt)
+    dataset = prepare_dataset(training_data, tokenizer, max_seq_length, packing, dataset_cache_dir)
     
     # Training arguments
     args = TrainingArguments(
         output_dir=output_dir,
         per_device_train_batch_size=batch_size,
-        gradient_accumulation_steps=4,
+        gradient_accumulation_steps=grad_accum_steps,
         num_train_epochs=epochs,
         learning_rate=learning_rate,
-        fp16=True,
-        bf16=False,
+        fp16=(precision == "fp16"),
+        bf16=(precision == "bf16"),
         logging_steps=10,
         save_steps=100,
+        save_safetensors=True,
         save_total_limit=3,
         warmup_ratio=0.1,
         lr_scheduler_type="cosine",
-        optim="adamw_8bit",
+        optim=optim,
         weight_decay=0.01,
         report_to="none",
+        **dataloader_args(),
     )
     
     # Train
@@ -168,20 +459,29 @@ def train_with_unsloth(
         model=model,
         tokenizer=tokenizer,
         train_dataset=dataset,
-        dataset_text_field="text",
         max_seq_length=max_seq_length,
+        # Already tokenized (and packed) by prepare_dataset(), so TRL must
+        # not re-process it; the collator pads and builds causal LM labels
+        dataset_kwargs={"skip_prepare_dataset": True},
+        data_collator=DataCollatorForLanguageModeling(tokenizer, mlm=False),
         args=args,
     )
     
-    trainer.train()
+    run_config = {
+        "trainer": "unsloth", "base_model": base_model, "data": source_key(training_data),
+        "quantize": quantize, "lora_rank": lora_rank, "epochs": epochs, "batch_size": batch_size,
+        "grad_accum_steps": grad_accum_steps, "learning_rate": learning_rate,
+        "max_seq_length": max_seq_length, "packing": packing,
+    }
+    trainer.train(resume_from_checkpoint=resolve_checkpoint(output_dir, resume, run_config))
     
     # Save
     print(f"\n💾 Saving to {output_dir}...")
-    model.save_pretrained(output_dir)
+    model.save_pretrained(output_dir, safe_serialization=True)
     tokenizer.save_pretrained(output_dir)
     
     print("\n✅ Training complete!")
-    return output_dir
+    return model, tokenizer
 
 
 def train_standard(
@@ -192,56 +492,88 @@ def train_standard(
     lora_rank: int = 16,
     epochs: int = 3,
     batch_size: int = 2,
+    grad_accum_steps: int = 4,
     learning_rate: float = 2e-4,
     max_seq_length: int = 2048,
+    precision: str = "bf16",
+    optim: str = "paged_adamw_8bit",
+    gradient_checkpointing_interval: int = 1,
+    packing: bool = True,
+    dataset_cache_dir: Optional[str] = None,
+    resume: Optional[bool] = None,
+    compile_model: bool = True,
 ):
     """Fine-tune using standard transformers + PEFT"""
+    print(f"\n🚀 Training with standard transformers + PEFT")
+    print(f"   Base model: {base_model}")
+    print(f"   Quantization: {quantize}-bit")
+    print(f"   LoRA rank: {lora_rank}")
+    print(f"   Epochs: {epochs}")
+    print(f"   Batch: {batch_size} x {grad_accum_steps} accumulation steps")
+    print(f"   Precision: {precision}")
+    print(f"   Optimizer: {optim}")
+    
     import torch
-    from datasets import load_dataset
+    from peft import LoraConfig, get_peft_model
     from transformers import (
-        AutoModelForCausalLM, 
-        AutoTokenizer, 
-        TrainingArguments,
+        AutoModelForCausalLM,
+        AutoTokenizer,
         BitsAndBytesConfig,
+        DataCollatorForLanguageModeling,
+        TrainingArguments,
     )
-    from peft import LoraConfig, get_peft_model, prepare_model_for_kbit_training
     from trl import SFTTrainer
     
-    print(f"\n🚀 Training with standard transformers + PEFT")
-    print(f"   Base model: {base_model}")
-    print(f"   Quantization: {quantize}-bit")
-    print(f"   LoRA rank: {lora_rank}")
-    print(f"   Epochs: {epochs}")
+    compute_dtype = torch.bfloat16 if precision == "bf16" else torch.float16
+    
+    if quantize != 16 and not BNB_AVAILABLE:
+        print(f"❌ {quantize}-bit quantization needs bitsandbytes (or use --quantize 16)")
+        sys.exit(1)
     
     # Quantization config
     if quantize == 4:
         bnb_config = BitsAndBytesConfig(
             load_in_4bit=True,
             bnb_4bit_quant_type="nf4",
-            bnb_4bit_compute_dtype=torch.float16,
+            bnb_4bit_compute_dtype=compute_dtype,
             bnb_4bit_use_double_quant=True,
+            bnb_4bit_quant_storage=compute_dtype,
         )
     elif quantize == 8:
         bnb_config = BitsAndBytesConfig(load_in_8bit=True)
     else:
         bnb_config = None
     
-    # Load model
+    # Load model, preferring Flash Attention 2 (needs fp16/bf16 weights)
     print("\n📦 Loading model...")
-    model = AutoModelForCausalLM.from_pretrained(
-        base_model,
+    model_kwargs = dict(
         quantization_config=bnb_config,
         device_map="auto",
         trust_remote_code=True,
+        torch_dtype=compute_dtype,
     )
+    try:
+        model = AutoModelForCausalLM.from_pretrained(
+            base_model, attn_implementation="flash_attention_2", **model_kwargs
+        )
+    except (ImportError, ValueError) as e:
+        print(f"  ⚠️ Flash Attention 2 unavailable ({e}), using SDPA")
+        model = AutoModelForCausalLM.from_pretrained(
+            base_model, attn_implementation="sdpa", **model_kwargs
+        )
     
     tokenizer = AutoTokenizer.from_pretrained(base_model)
     tokenizer.pad_token = tokenizer.eos_token
     tokenizer.padding_side = "right"
     
-    # Prepare for training
+    # Prepare for training. Only the LoRA adapters are trained, so the frozen
+    # layernorms/embeddings stay in the compute dtype instead of being upcast
+    # to fp32 the way prepare_model_for_kbit_training() does.
     if bnb_config:
-        model = prepare_model_for_kbit_training(model)
+        model.config.use_cache = False
+        if gradient_checkpointing_interval == 1:
+            model.gradient_checkpointing_enable()
+        model.enable_input_require_grads()
     
     # LoRA config
     lora_config = LoraConfig(
@@ -258,40 +590,37 @@ def train_standard(
     model = get_peft_model(model, lora_config)
     model.print_trainable_parameters()
     
-    # Load dataset
-    print(f"📊 Loading training data from {training_data}...")
-    dataset = load_dataset("json", data_files=training_data, split="train")
-    print(f"   {len(dataset)} examples loaded")
+    if bnb_config and gradient_checkpointing_interval > 1:
+        checkpoint_every_nth_layer(model, gradient_checkpointing_interval)
     
-    # Format function
-    def format_prompt(example):
-        text = ""
-        for turn in example.get("conversations", []):
-            if turn["from"] == "system":
-                text += f"<|im_start|>system\n{turn['value']}<|im_end|>\n"
-            elif turn["from"] == "human":
-                text += f"<|im_start|>user\n{turn['value']}<|im_end|>\n"
-            elif turn["from"] == "gpt":
-                text += f"<|im_start|>assistant\n{turn['value']}<|im_end|>\n"
-        return {"text": text}
+    # Unsloth ships its own kernels; here torch.compile fuses the forward instead
+    compile_model = compile_model and hasattr(torch, "compile")
+    if compile_model:
+        torch._dynamo.config.cache_size_limit = 64  # sequence lengths vary between batches
     
-    dataset = dataset.map(format_prompt)
+    # Load dataset
+    dataset = prepare_dataset(training_data, tokenizer, max_seq_length, packing, dataset_cache_dir)
     
     # Training arguments
     args = TrainingArguments(
         output_dir=output_dir,
         per_device_train_batch_size=batch_size,
-        gradient_accumulation_steps=4,
+        gradient_accumulation_steps=grad_accum_steps,
         num_train_epochs=epochs,
         learning_rate=learning_rate,
-        fp16=True,
+        fp16=(precision == "fp16"),
+        bf16=(precision == "bf16"),
         logging_steps=10,
         save_steps=100,
+        save_safetensors=True,
         save_total_limit=3,
         warmup_ratio=0.1,
         lr_scheduler_type="cosine",
+        optim=optim,
+        torch_compile=compile_model,
         weight_decay=0.01,
         report_to="none",
+        **dataloader_args(),
     )
     
     # Train
@@ -300,49 +629,73 @@ def train_standard(
         model=model,
         tokenizer=tokenizer,
         train_dataset=dataset,
-        dataset_text_field="text",
         max_seq_length=max_seq_length,
+        # Already tokenized (and packed) by prepare_dataset(), so TRL must
+        # not re-process it; the collator pads and builds causal LM labels
+        dataset_kwargs={"skip_prepare_dataset": True},
+        data_collator=DataCollatorForLanguageModeling(tokenizer, mlm=False),
         args=args,
     )
     
-    trainer.train()
+    run_config = {
+        "trainer": "standard", "base_model": base_model, "data": source_key(training_data),
+        "quantize": quantize, "lora_rank": lora_rank, "epochs": epochs, "batch_size": batch_size,
+        "grad_accum_steps": grad_accum_steps, "learning_rate": learning_rate,
+        "max_seq_length": max_seq_length, "packing": packing,
+    }
+    trainer.train(resume_from_checkpoint=resolve_checkpoint(output_dir, resume, run_config))
     
     # Save
     print(f"\n💾 Saving to {output_dir}...")
-    model.save_pretrained(output_dir)
+    model.save_pretrained(output_dir, safe_serialization=True)
     tokenizer.save_pretrained(output_dir)
     
     print("\n✅ Training complete!")
-    return output_dir
+    return model, tokenizer
 
 
-def merge_and_export(lora_dir: str, output_dir: str, base_model: str):
-    """Merge LoRA with base model and export for Ollama"""
-    try:
-        from unsloth import FastLanguageModel
+def merge_and_export(lora_dir: str, output_dir: str, base_model: str,
+                     merger: str = "standard", model=None, tokenizer=None):
+    """Merge LoRA with base model and export for Ollama
+    
+    merger is what check_merge_deps() (or check_training_deps()) picked. Pass
+    the just-trained model and tokenizer to skip reloading them from lora_dir.
+    """
+    if merger == "unsloth":
         print("\n🔀 Merging LoRA with base model (using Unsloth)...")
         
-        model, tokenizer = FastLanguageModel.from_pretrained(
-            model_name=lora_dir,
-            load_in_4bit=True,
-        )
+        if model is None:
+            from unsloth import FastLanguageModel
+            model, tokenizer = FastLanguageModel.from_pretrained(
+                model_name=lora_dir,
+                load_in_4bit=True,
+            )
         
         model.save_pretrained_merged(output_dir, tokenizer, save_method="merged_16bit")
         print(f"✅ Merged model saved to {output_dir}")
         
-    except ImportError:
-        from transformers import AutoModelForCausalLM, AutoTokenizer
-        from peft import PeftModel
-        
+    else:
         print("\n🔀 Merging LoRA with base model (using transformers)...")
         
-        base = AutoModelForCausalLM.from_pretrained(base_model, device_map="auto")
-        model = PeftModel.from_pretrained(base, lora_dir)
+        if model is None:
+            import torch
+            from peft import PeftModel
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            
+            # Merging is a one-off, so do it on the CPU in bf16 rather than
+            # competing with the GPU for VRAM
+            base = AutoModelForCausalLM.from_pretrained(
+                base_model,
+                torch_dtype=torch.bfloat16,
+                low_cpu_mem_usage=True,
+                device_map={"": "cpu"},
+            )
+            model = PeftModel.from_pretrained(base, lora_dir)
+            del base
+            tokenizer = AutoTokenizer.from_pretrained(lora_dir)
         model = model.merge_and_unload()
         
-        tokenizer = AutoTokenizer.from_pretrained(lora_dir)
-        
-        model.save_pretrained(output_dir)
+        model.save_pretrained(output_dir, safe_serialization=True, max_shard_size="4GB")
         tokenizer.save_pretrained(output_dir)
         print(f"✅ Merged model saved to {output_dir}")
     
@@ -371,12 +724,35 @@ def main():
                         help="Number of training epochs")
     parser.add_argument("--batch-size", type=int, default=2,
                         help="Training batch size")
+    parser.add_argument("--grad-accum-steps", type=int, default=4,
+                        help="Gradient accumulation steps")
+    parser.add_argument("--effective-batch-size", type=int, default=None,
+                        help="Target batch size per optimizer step; overrides --grad-accum-steps")
     parser.add_argument("--learning-rate", type=float, default=2e-4,
                         help="Learning rate")
     parser.add_argument("--max-seq-length", type=int, default=2048,
                         help="Maximum sequence length")
+    parser.add_argument("--optim", type=str, default="auto",
+                        choices=["auto", "adamw_8bit", "paged_adamw_8bit", "adamw_torch_fused", "adafactor"],
+                        help="Optimizer (auto = paged_adamw_8bit when quantized, adamw_torch_fused at 16-bit)")
+    parser.add_argument("--gradient-checkpointing-interval", type=int, default=1,
+                        help="Checkpoint every Nth decoder layer on the standard quantized path "
+                             "(1 = all layers; higher = faster, more VRAM)")
+    parser.add_argument("--no-packing", dest="packing", action="store_false",
+                        help="Train on one conversation per sequence instead of packing them")
+    parser.add_argument("--dataset-cache-dir", type=str, default=None,
+                        help="Keep a memory-mapped Arrow copy of the training data here")
+    parser.add_argument("--precision", type=str, choices=["auto", "bf16", "fp16"], default="auto",
+                        help="Mixed precision mode (auto = bf16 if the GPU supports it)")
+    parser.add_argument("--resume", action=argparse.BooleanOptionalAction, default=None,
+                        help="Resume from the latest checkpoint in --output-dir (default: if that "
+                             "run is unfinished and used the same settings and data)")
+    parser.add_argument("--no-compile", dest="compile", action="store_false",
+                        help="Don't torch.compile the model on the standard path")
     parser.add_argument("--merge", action="store_true",
                         help="Merge LoRA with base and export")
+    parser.add_argument("--merge-after-training", action="store_true",
+                        help="Merge and export right after training, reusing the in-memory model")
     parser.add_argument("--merged-output", type=str, default="models/abby_merged",
                         help="Output directory for merged model")
     args = parser.parse_args()
@@ -385,6 +761,18 @@ def main():
     project_root = Path(__file__).parent.parent
     training_data = project_root / args.training_data
     output_dir = project_root / args.output_dir
+    dataset_cache_dir = str(project_root / args.dataset_cache_dir) if args.dataset_cache_dir else None
+    
+    print("=" * 60)
+    print("🎯 Abby Model Fine-tuning")
+    print("=" * 60)
+    
+    # If just merging, only the merge dependencies are needed
+    if args.merge:
+        merger = check_merge_deps()
+        merged_output = project_root / args.merged_output
+        merge_and_export(str(output_dir), str(merged_output), args.base_model, merger)
+        return
     
     if not training_data.exists():
         print(f"❌ Training data not found: {training_data}")
@@ -395,22 +783,16 @@ def main():
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    print("=" * 60)
-    print("🎯 Abby Model Fine-tuning")
-    print("=" * 60)
-    
     # Check dependencies
-    trainer_type = check_dependencies()
+    trainer_type = check_training_deps()
     
-    # If just merging
-    if args.merge:
-        merged_output = project_root / args.merged_output
-        merge_and_export(str(output_dir), str(merged_output), args.base_model)
-        return
+    precision = resolve_precision(args.precision)
+    optim = resolve_optim(args.optim, args.quantize)
+    grad_accum_steps = resolve_grad_accum(args.grad_accum_steps, args.effective_batch_size, args.batch_size)
     
     # Train
     if trainer_type == "unsloth":
-        train_with_unsloth(
+        model, tokenizer = train_with_unsloth(
             base_model=args.base_model,
             training_data=str(training_data),
             output_dir=str(output_dir),
@@ -418,11 +800,17 @@ def main():
             lora_rank=args.lora_rank,
             epochs=args.epochs,
             batch_size=args.batch_size,
+            grad_accum_steps=grad_accum_steps,
             learning_rate=args.learning_rate,
             max_seq_length=args.max_seq_length,
+            precision=precision,
+            optim=optim,
+            packing=args.packing,
+            dataset_cache_dir=dataset_cache_dir,
+            resume=args.resume,
         )
     else:
-        train_standard(
+        model, tokenizer = train_standard(
             base_model=args.base_model,
             training_data=str(training_data),
             output_dir=str(output_dir),
@@ -430,14 +818,33 @@ def main():
             lora_rank=args.lora_rank,
             epochs=args.epochs,
             batch_size=args.batch_size,
+            grad_accum_steps=grad_accum_steps,
             learning_rate=args.learning_rate,
             max_seq_length=args.max_seq_length,
+            precision=precision,
+            optim=optim,
+            gradient_checkpointing_interval=args.gradient_checkpointing_interval,
+            compile_model=args.compile,
+            packing=args.packing,
+            dataset_cache_dir=dataset_cache_dir,
+            resume=args.resume,
         )
     
     print("\n" + "=" * 60)
     print("🎉 Training Complete!")
     print("=" * 60)
     print(f"\nLoRA weights saved to: {output_dir}")
+    
+    if args.merge_after_training:
+        # Merging a bitsandbytes-quantized model in place would export
+        # quantized weights, so the standard path reloads the base in 16-bit
+        if trainer_type == "standard" and args.quantize != 16:
+            model = tokenizer = None
+        merged_output = project_root / args.merged_output
+        merge_and_export(str(output_dir), str(merged_output), args.base_model,
+                         trainer_type, model=model, tokenizer=tokenizer)
+        return
+    
     print("\nNext steps:")
     print(f"  1. Merge and export: python training/finetune_abby.py --merge")
     print(f"  2. Convert to GGUF (see FINETUNING_AMD.md)")